@@ -66,7 +66,7 @@ start "Speedtest Collector" powershell -NoExit -ExecutionPolicy Bypass ^
 
 REM --- Launch dashboard (window stays open)
 start "Speedtest Dashboard" powershell -NoExit -ExecutionPolicy Bypass ^
-  -Command "Set-Location -LiteralPath '%ROOT%'; & '%PY%' -m streamlit run 'dashboard.py'"
+  -Command "Set-Location -LiteralPath '%ROOT%'; & '%PY%' -m streamlit run 'src\speedtest_dashboard\dashboard.py'"
 
 echo.
 echo [INFO] Launched collector and dashboard.
@@ -42,7 +42,7 @@ $CollectorArgs = @(
 )
 
 $DashboardArgs = @(
-  '-NoExit','-Command', "Set-Location '$Root'; & '$Py' -m streamlit run 'dashboard.py'"
+  '-NoExit','-Command', "Set-Location '$Root'; & '$Py' -m streamlit run 'src\speedtest_dashboard\dashboard.py'"
 )
 
 # --- Launch two windows
@@ -0,0 +1,14 @@
+from __future__ import annotations
+import functools
+import importlib.resources
+import os
+import pathlib
+
+# collector.py and dashboard.py ship inside the package, so there is nothing to search for
+_PKG_DIR = str(importlib.resources.files(__package__))
+
+@functools.lru_cache(maxsize=4)
+def _locate(name: str) -> tuple[pathlib.Path, str]:
+    """(path, str(path)) of a script shipped in the package."""
+    path_s = os.path.join(_PKG_DIR, name)
+    return pathlib.Path(path_s), path_s
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Speedtest collector with engine tagging, Ookla license handling, and safe fallbacks.
+
+Features:
+- Prefers Ookla CLI with explicit license/GDPR acceptance flags.  Falls back to Python speedtest-cli on failure or if CLI is missing.
+- Retries with exponential backoff on transient errors (e.g., 403) and rc=1 license prompts.
+- Records UTC timestamps.
+- Main CSV retains 30 days.  Monthly archives retain 12 months.
+- Multi-server support (--servers "id1,id2"), optionally tested concurrently (--parallel).
+- Append-only writes on each cycle; the main CSV is pruned (atomic rewrite) at most once per hour.
+- Atomic writes with retries (Dropbox/Excel/AV friendly).
+- Engine column indicates 'ookla-cli' or 'python-lib'.
+
+Usage:
+  python collector.py                                  # run once (best server)
+  python collector.py --daemon --interval 120          # every 2 minutes
+  python collector.py --servers 20013,12345            # test specific server IDs
+  python collector.py --servers 20013,12345 --parallel # test them concurrently
+  python collector.py --list-servers 10                # list 10 nearby servers and exit
+
+Optional flags:
+  --require-ookla    Error out if Ookla CLI is not installed.
+  --no-ookla         Do not use Ookla CLI even if present.
+
+Prereqs:
+  pip install pandas speedtest-cli   (pandas is only imported when pruning)
+  (Recommended) Install Ookla CLI and add to PATH.  If missing, this script will still run via Python fallback.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported lazily at runtime: only the hourly prune needs it
+
+# ---------- Paths / Config ----------
+ROOT = Path(r"C:\Users\niles\Dropbox\Python Code\Speedtest")
+DEFAULT_CSV = ROOT / "speedtest_results.csv"
+ARCHIVE_DIR = ROOT / "archive"
+
+COLUMNS = ["timestamp", "ping_ms", "download_mbps", "upload_mbps", "server_id", "server_name", "engine"]
+# Explicit dtypes for re-reading our own CSVs: skips pandas type inference and keeps
+# server IDs as text (otherwise a blank cell turns the column into floats like "20013.0").
+CSV_DTYPES = {
+    "timestamp": str,
+    "ping_ms": "float64",
+    "download_mbps": "float64",
+    "upload_mbps": "float64",
+    "server_id": str,
+    "server_name": str,
+    "engine": str,
+}
+MAIN_RETENTION_DAYS = 30
+ARCHIVE_RETENTION_MONTHS = 12
+
+# One-time info flag
+_ookla_guidance_printed = False
+
+# UTC hour ("YYYY-MM-DDTHH") of the last main-CSV prune; pruning is lazy
+_last_prune_hour: Optional[str] = None
+
+
+# ---------- Filesystem helpers ----------
+def ensure_paths() -> None:
+    ROOT.mkdir(parents=True, exist_ok=True)
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def ensure_csv_exists(path: Path) -> None:
+    if not path.exists():
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(COLUMNS)
+
+
+def write_results_csv(df: pd.DataFrame, dest) -> None:
+    """
+    Write df as CSV to dest (a path or binary file object).
+    Uses pyarrow's C++ writer when installed, else pandas' to_csv.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        df.to_csv(dest, index=False, encoding="utf-8")
+        return
+
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), dest)
+
+
+def save_atomic(df: pd.DataFrame, path: Path) -> None:
+    """Atomic write with retries to survive transient Windows locks (Excel/Dropbox/AV)."""
+    path = Path(path)
+    tmp_dir = path.parent
+    with tempfile.NamedTemporaryFile(delete=False, dir=tmp_dir, prefix=path.stem + "_", suffix=".tmp") as f:
+        write_results_csv(df, f)
+        tmp_path = Path(f.name)
+
+    last_err = None
+    for attempt in range(8):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError as e:
+            last_err = e
+            time.sleep(0.5 * (attempt + 1))
+
+    # Fallback direct write
+    try:
+        write_results_csv(df, str(path))
+    except Exception:
+        if last_err:
+            raise last_err
+        raise
+    finally:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except Exception:
+            pass
+
+
+# ---------- Data helpers ----------
+def utc_now_iso() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def read_results_csv(path: Path) -> pd.DataFrame:
+    """
+    Read a results CSV with the fixed schema; unknown columns are left to inference.
+    Uses pyarrow's multithreaded reader when installed, else the pandas C parser.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        import pandas as pd
+
+        return pd.read_csv(path, dtype=CSV_DTYPES)
+
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    # Types are given to the reader itself: pandas' engine="pyarrow" would infer first and
+    # cast afterwards, reformatting timestamps and turning IDs into "20013.0".
+    column_types = {c: (pa.float64() if t == "float64" else pa.string()) for c, t in CSV_DTYPES.items()}
+    table = pa_csv.read_csv(
+        path, convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+    )
+    return table.to_pandas()
+
+
+def load_existing(path: Path) -> pd.DataFrame:
+    import pandas as pd
+
+    if path.exists():
+        try:
+            df = read_results_csv(path)
+        except Exception:
+            df = pd.DataFrame()
+    else:
+        df = pd.DataFrame()
+
+    # One reindex builds the fixed column layout (missing columns as NaN) in a single allocation
+    df = df.reindex(columns=COLUMNS)
+    df["server_id"] = _sanitize_sid_series(df["server_id"])
+    return df
+
+
+def append_rows(path: Path, rows: List[Dict]) -> None:
+    """Append rows to a results CSV without rewriting it.  Retries on transient Windows locks."""
+    path = Path(path)
+    records = [[r.get(c) for c in COLUMNS] for r in rows]
+    last_err = None
+    for attempt in range(8):
+        try:
+            write_header = not path.exists()
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                if write_header:
+                    w.writerow(COLUMNS)
+                w.writerows(records)
+            return
+        except PermissionError as e:
+            last_err = e
+            time.sleep(0.5 * (attempt + 1))
+    raise last_err
+
+
+class CsvAppender:
+    """
+    Append-mode handle on a results CSV, kept open across --daemon cycles so each sample
+    is one buffered write + fsync instead of an open/close.  Reopens if the file was
+    replaced or removed underneath it; close() before rewriting the file in place.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._f = None
+        self._writer = None
+
+    def _open(self) -> None:
+        last_err = None
+        for attempt in range(8):
+            try:
+                self._f = open(self.path, "a", newline="", encoding="utf-8", buffering=1 << 16)
+                break
+            except PermissionError as e:
+                last_err = e
+                time.sleep(0.5 * (attempt + 1))
+        else:
+            raise last_err
+        self._writer = csv.writer(self._f)
+        if self._f.tell() == 0:
+            self._writer.writerow(COLUMNS)
+
+    def _is_stale(self) -> bool:
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._f.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        if self._f is not None and self._is_stale():
+            self.close()
+        if self._f is None:
+            self._open()
+        self._writer.writerows([r.get(c) for c in COLUMNS] for r in rows)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        if self._f is not None:
+            try:
+                self._f.close()
+            finally:
+                self._f = None
+                self._writer = None
+
+
+def prune_main(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    # Timestamps are fixed-format UTC ISO strings, so lexicographic order is chronological order.
+    cutoff = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - MAIN_RETENTION_DAYS * 86400))
+    return df[df["timestamp"].fillna("") >= cutoff]
+
+
+def maybe_prune_main(path: Path, appender: Optional[CsvAppender] = None) -> None:
+    """Drop expired rows from the main CSV, at most once per UTC hour."""
+    global _last_prune_hour
+    hour = utc_now_iso()[:13]
+    if hour == _last_prune_hour:
+        return
+    df = load_existing(path)
+    kept = prune_main(df)
+    if len(kept) != len(df):
+        if appender is not None:
+            appender.close()  # Windows cannot replace a file we hold open; reopened on next write
+        save_atomic(kept, path)
+    _last_prune_hour = hour
+
+
+def archive_append(row: Dict) -> None:
+    key = row["timestamp"][:7]  # "YYYY-MM" of the "%Y-%m-%dT%H:%M:%SZ" timestamp
+    path = ARCHIVE_DIR / f"speedtest_{key}.csv"
+    append_rows(path, [row])
+
+    files = sorted(ARCHIVE_DIR.glob("speedtest_*.csv"))
+    if len(files) > ARCHIVE_RETENTION_MONTHS:
+        for f in files[: len(files) - ARCHIVE_RETENTION_MONTHS]:
+            try:
+                f.unlink()
+            except Exception:
+                pass
+
+
+# ---------- Server info sanitation ----------
+def sanitize_server_info(server_id: Optional[str], server_name: Optional[str]) -> Tuple[str, str]:
+    sid = "" if server_id is None else str(server_id).strip()
+    if sid.lower() in {"nan", "none"}:
+        sid = ""
+    if sid.endswith(".0"):
+        sid = sid[:-2]
+    sname = (server_name or "").strip()
+    if sname.lower() in {"nan", "none"}:
+        sname = ""
+    return sid, sname
+
+
+def _sanitize_sid_series(s: pd.Series) -> pd.Series:
+    """Column-wise sanitize_server_info for server IDs, used when loading whole files."""
+    s = s.fillna("").astype(str).str.strip()
+    s = s.mask(s.str.lower().isin({"nan", "none"}), "")
+    return s.str.removesuffix(".0")
+
+
+# ---------- Ookla CLI vs Python library ----------
+def have_ookla_cli() -> bool:
+    exe = shutil.which("speedtest")
+    return exe is not None
+
+
+def print_ookla_install_guidance_once() -> None:
+    global _ookla_guidance_printed
+    if _ookla_guidance_printed:
+        return
+    _ookla_guidance_printed = True
+    print(
+        "\n[INFO] Ookla Speedtest CLI was not found on PATH.  Using the Python speedtest-cli fallback.\n"
+        "       The official Ookla CLI is more reliable and avoids 403 errors.\n"
+        "       Install it on Windows via ZIP: https://www.speedtest.net/apps/cli  → extract to e.g. C:\\Tools\\OoklaSpeedtest\n"
+        "       Then add that folder to your PATH.  Verify with:  speedtest -V\n"
+    )
+
+
+def _build_ookla_cmd(server_id: Optional[str], fmt_variant: str = "long") -> list[str]:
+    """
+    Build Ookla CLI command with license acceptance flags.
+    fmt_variant: 'long' uses --format=json, 'short' uses -f json.
+    """
+    cmd = ["speedtest", "--progress=no", "--accept-license", "--accept-gdpr"]
+    if fmt_variant == "long":
+        cmd += ["--format=json"]
+    else:
+        cmd += ["-f", "json"]
+    if server_id:
+        cmd += ["--server-id", str(int(server_id))]
+    return cmd
+
+
+def run_one_via_ookla(server_id: Optional[str] = None) -> Dict:
+    """
+    Use Ookla CLI with acceptance flags.  Try both format variants.
+    Tag engine='ookla-cli'.
+    """
+    last_err: Optional[Exception] = None
+    for fmt in ("long", "short"):
+        cmd = _build_ookla_cmd(server_id, fmt_variant=fmt)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        if result.returncode == 0:
+            try:
+                data = json.loads(result.stdout)
+            except json.JSONDecodeError as e:
+                last_err = RuntimeError(f"Ookla CLI returned non‑JSON output: {e}.  stdout[:200]={result.stdout[:200]}")
+                continue
+
+            dl_bps = float(data.get("download", {}).get("bandwidth", 0.0) * 8.0)  # bytes/s → bits/s
+            ul_bps = float(data.get("upload", {}).get("bandwidth", 0.0) * 8.0)
+            ping_ms = float(data.get("ping", {}).get("latency", 0.0))
+            server = data.get("server", {}) or {}
+            sid = str(server.get("id") or "")
+            sname = " - ".join([p for p in [server.get("name"), server.get("location")] if p])
+            sid, sname = sanitize_server_info(sid, sname)
+            return {
+                "timestamp": utc_now_iso(),
+                "ping_ms": round(ping_ms, 3),
+                "download_mbps": round(dl_bps / 1_000_000.0, 3),
+                "upload_mbps": round(ul_bps / 1_000_000.0, 3),
+                "server_id": sid,
+                "server_name": sname,
+                "engine": "ookla-cli",
+            }
+
+        # If license text still appears, surface a clear error
+        lc_stderr = (result.stderr or "").lower()
+        lc_stdout = (result.stdout or "").lower()
+        if "license" in lc_stderr or "personal, non-commercial use" in lc_stderr or \
+           "license" in lc_stdout or "personal, non-commercial use" in lc_stdout:
+            raise RuntimeError(
+                "Ookla CLI requires license acceptance.  This script passes --accept-license and --accept-gdpr, "
+                "but your binary still exited with rc=1.  Run once manually to seed acceptance, then retry:\n"
+                "  speedtest --accept-license --accept-gdpr -f json --progress=no"
+            )
+
+        last_err = RuntimeError(f"Ookla CLI failed (rc={result.returncode}): {(result.stderr or '')[:200]}")
+
+    assert last_err is not None
+    raise last_err
+
+
+def run_one_via_python(server_id: Optional[str] = None) -> Dict:
+    """
+    Use Python speedtest-cli.  Tag engine='python-lib'.
+    """
+    import speedtest  # lazy import
+
+    st = speedtest.Speedtest()
+    if server_id:
+        st.get_servers([int(server_id)])
+        server = st.get_best_server()
+    else:
+        st.get_servers()
+        server = st.get_best_server()
+
+    download_bps = st.download()
+    upload_bps = st.upload()
+    ping_ms = float(st.results.ping)
+
+    sid = str(server.get("id") or "")
+    sname = " - ".join([p for p in [server.get("sponsor"), server.get("name")] if p])
+    sid, sname = sanitize_server_info(sid, sname)
+
+    return {
+        "timestamp": utc_now_iso(),
+        "ping_ms": round(ping_ms, 3),
+        "download_mbps": round(download_bps / 1_000_000.0, 3),
+        "upload_mbps": round(upload_bps / 1_000_000.0, 3),
+        "server_id": sid,
+        "server_name": sname,
+        "engine": "python-lib",
+    }
+
+
+def run_one(server_id: Optional[str], prefer_ookla: bool, allow_python_fallback: bool) -> Dict:
+    """
+    Try Ookla first if requested/available.  Fall back to Python lib if allowed.
+    Retried by caller on failure.
+    """
+    if prefer_ookla and have_ookla_cli():
+        return run_one_via_ookla(server_id)
+
+    if prefer_ookla and not have_ookla_cli():
+        print_ookla_install_guidance_once()
+        if not allow_python_fallback:
+            raise RuntimeError("Ookla CLI is required by --require-ookla but was not found on PATH.")
+
+    return run_one_via_python(server_id)
+
+
+def run_with_retries(server_id: Optional[str], prefer_ookla: bool, allow_python_fallback: bool) -> Optional[Dict]:
+    """
+    run_one with exponential backoff (4 attempts).  Returns None if every attempt failed.
+    """
+    delay = 2.0
+    last_err: Optional[Exception] = None
+    for attempt in range(4):
+        try:
+            return run_one(server_id, prefer_ookla=prefer_ookla, allow_python_fallback=allow_python_fallback)
+        except Exception as e:
+            last_err = e
+            msg = (str(e) or "").lower()
+            if "403" in msg or "forbidden" in msg:
+                print(f"[WARN] 403/Forbidden from speedtest backend (attempt {attempt+1}/4).  Backing off {delay:.0f}s …")
+            elif "license" in msg:
+                print(f"[WARN] License acceptance needed or not persisted (attempt {attempt+1}/4).  Backing off {delay:.0f}s …")
+            else:
+                print(f"[WARN] Speedtest attempt {attempt+1}/4 failed: {e}.  Backing off {delay:.0f}s …")
+            time.sleep(delay)
+            delay *= 2
+    print(f"[ERROR] Giving up for this cycle for server {server_id or '(best)'}: {last_err}")
+    return None
+
+
+# ---------- Public API ----------
+def list_nearby_servers(n: int = 10):
+    """List nearby servers via Python lib (sufficient for discovery)."""
+    try:
+        import speedtest
+        st = speedtest.Speedtest()
+        st.get_servers()
+        nearby = st.get_closest_servers()
+        out = []
+        for s in nearby[:max(1, n)]:
+            sid, sname = sanitize_server_info(str(s.get("id")), f"{s.get('sponsor')} - {s.get('name')}")
+            out.append(
+                {"id": sid, "label": f"{sid}  {sname}", "country": s.get("country"), "host": s.get("host")}
+            )
+        return out
+    except Exception as e:
+        print(f"[WARN] Could not list servers: {e}")
+        return []
+
+
+# ---------- Main ----------
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interval", type=int, default=120, help="Seconds between tests when --daemon is used.")
+    parser.add_argument("--servers", type=str, help="Comma-separated Speedtest server IDs to test.")
+    parser.add_argument("--list-servers", type=int, metavar="N", help="List N nearby servers and exit.")
+    parser.add_argument("--daemon", action="store_true", help="Run continuously every --interval seconds.")
+    parser.add_argument("--require-ookla", action="store_true", help="Fail if Ookla CLI is not installed.")
+    parser.add_argument("--no-ookla", action="store_true", help="Do not use Ookla CLI even if present.")
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Test all --servers at once instead of one after another.  Faster cycles, but the tests share "
+             "your bandwidth, so each server's result will read lower.",
+    )
+    args = parser.parse_args(argv)  # None: sys.argv[1:]
+
+    ensure_paths()
+    ensure_csv_exists(DEFAULT_CSV)
+
+    if args.list_servers:
+        near = list_nearby_servers(args.list_servers)
+        if near:
+            print("\nNearby servers:")
+            for s in near:
+                print(f"{s['id']:>6}  {s['label']}  ({s.get('country','')})  {s.get('host','')}")
+        else:
+            print("No server list available.")
+        return
+
+    prefer_ookla = not args.no_ookla
+    allow_python_fallback = not args.require_ookla
+
+    if prefer_ookla and not have_ookla_cli():
+        print_ookla_install_guidance_once()
+
+    server_ids = [sid.strip() for sid in args.servers.split(",")] if args.servers else []
+    appender = CsvAppender(DEFAULT_CSV)
+
+    def once():
+        targets = server_ids or [None]
+        if args.parallel and len(targets) > 1:
+            with ThreadPoolExecutor(max_workers=len(targets)) as ex:
+                results = list(ex.map(lambda sid: run_with_retries(sid, prefer_ookla, allow_python_fallback), targets))
+        else:
+            results = [run_with_retries(sid, prefer_ookla, allow_python_fallback) for sid in targets]
+        rows: List[Dict] = [r for r in results if r is not None]
+
+        if not rows:
+            return
+
+        appender.write_rows(rows)
+        maybe_prune_main(DEFAULT_CSV, appender)
+
+        for r in rows:
+            archive_append(r)
+
+        for r in rows:
+            print(
+                f"[{r['timestamp']}] ping={r['ping_ms']} ms, down={r['download_mbps']} Mbps, "
+                f"up={r['upload_mps'] if 'upload_mps' in r else r['upload_mbps']} Mbps, "
+                f"server={r['server_id']} {r['server_name']}, engine={r['engine']}  ->  {DEFAULT_CSV}"
+            )
+
+    try:
+        if args.daemon:
+            jitter = 5 if args.interval >= 20 else 0
+            while True:
+                once()
+                time.sleep(max(5, int(args.interval)) + random.uniform(-jitter, jitter))
+        else:
+            once()
+    finally:
+        appender.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,732 @@
+#!/usr/bin/env python3
+"""
+Speedtest dashboard (compact UI + navy accents):
+- Settings expander (Timezone, Theme, Color selection)
+- Full IANA timezone list, default America/Chicago
+- Default chart type = Bar
+- Manual refresh button (disabled when auto-refresh is ON), optional 60s auto-refresh
+- Robust server filter (handles blank IDs, string-normalizes)
+- Dynamic sampling caption
+- Window choices: Last Hour, Last 24 hours, Last 7 days, Last 30 days, Last 12 months
+- Previous-period overlay aligned to the current window
+- User color pickers (defaults: Upload #8BDCCD, Download #1976D2, Ping #20B9D8)
+- Force Streamlit UI accents (radios/toggles/checkboxes/select & server tags) to navy #001F54
+"""
+
+import importlib.util
+import io
+import re
+from pathlib import Path
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+import plotly.graph_objects as go
+import streamlit as st
+from zoneinfo import ZoneInfo, available_timezones  # pip install tzdata on Windows
+
+# -------- PATHS / CONFIG --------
+ROOT = Path(r"C:\Users\niles\Dropbox\Python Code\Speedtest")
+DEFAULT_CSV = ROOT / "speedtest_results.csv"
+DEFAULT_CSV.parent.mkdir(parents=True, exist_ok=True)
+
+@st.cache_resource(show_spinner=False)
+def _all_timezones() -> tuple[str, ...]:
+    # available_timezones() walks the tzdata tree; list and sort it once per process
+    return tuple(sorted(available_timezones()))
+
+ALL_TZS = _all_timezones()
+DEFAULT_TZ = "America/Chicago"
+
+# Default series colors (your preference)
+DEFAULT_COLOR_UPLOAD = "#8BDCCD"
+DEFAULT_COLOR_DOWNLOAD = "#1976D2"
+DEFAULT_COLOR_PING = "#20B9D8"
+
+# Global accent color
+ACCENT_NAVY = "#001F54"
+
+# Traces longer than LTTB_MIN_POINTS are thinned to LTTB_POINTS before plotting (lines)
+# or averaged into LTTB_POINTS equal time buckets (bars)
+LTTB_MIN_POINTS = 1500
+LTTB_POINTS = 750
+
+# -------- THEME HELPERS --------
+def detect_windows_theme() -> str:
+    try:
+        import winreg
+        with winreg.OpenKey(
+            winreg.HKEY_CURRENT_USER,
+            r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize",
+        ) as key:
+            val, _ = winreg.QueryValueEx(key, "AppsUseLightTheme")
+            return "light" if int(val) == 1 else "dark"
+    except Exception:
+        return "light"
+
+@st.cache_data(show_spinner=False)
+def _build_css(theme: str, accent: str) -> tuple[str, str]:
+    """(style block, plotly template) for theme; built once per (theme, accent)."""
+    if theme == "dark":
+        bg, fg = "#0e1117", "#fafafa"
+        template = "plotly_dark"
+    else:
+        bg, fg = "white", "#0e0e0e"
+        template = "plotly_white"
+
+    css = f"""
+        <style>
+        .stApp {{
+            background-color: {bg};
+            color: {fg};
+        }}
+
+        /* Try to set Streamlit's logical 'primary color' via CSS vars */
+        :root {{
+            --primary-color: {accent};
+            --accent-color:  {accent};
+        }}
+
+        /* 1) Radios & checkboxes (native inputs) */
+        input[type="radio"], input[type="checkbox"] {{
+            accent-color: {accent} !important;
+        }}
+
+        /* 2) Streamlit's custom checkbox/radio containers (BaseWeb) */
+        /* checked circle for radio */
+        [role="radiogroup"] [aria-checked="true"] {{
+            border-color: {accent} !important;
+            background-color: {accent} !important;
+        }}
+        /* radio hover/focus ring */
+        [role="radiogroup"] > label:hover > div, [role="radiogroup"] > label:focus > div {{
+            box-shadow: 0 0 0 1px {accent}55;
+            border-color: {accent}55;
+        }}
+
+        /* checkbox tick */
+        [role="checkbox"][aria-checked="true"] {{
+            background-color: {accent} !important;
+            border-color: {accent} !important;
+        }}
+        /* checkbox focus ring */
+        [role="checkbox"]:focus {{
+            box-shadow: 0 0 0 1px {accent}55 !important;
+            border-color: {accent}55 !important;
+        }}
+
+        /* 3) Toggle switch */
+        [data-testid="stSwitch"] input:checked + div {{
+            background-color: {accent} !important;
+            border-color: {accent} !important;
+        }}
+
+        /* 4) Select / Multiselect borders & focus ring */
+        div[data-baseweb="select"] > div {{
+            border-color: {accent}33 !important;
+        }}
+        div[data-baseweb="select"] > div:focus-within {{
+            box-shadow: 0 0 0 1px {accent} !important;
+            border-color: {accent} !important;
+        }}
+
+        /* 5) Tags (server chips) */
+        div[data-baseweb="tag"] {{
+            background-color: {accent}1F !important; /* ~12% */
+            border-color: {accent} !important;
+            color: {accent} !important;
+        }}
+        div[data-baseweb="tag"] svg path {{
+            fill: {accent} !important; /* the 'x' icon */
+        }}
+
+        /* 6) Buttons */
+        .stButton > button {{
+            border-color: {accent} !important;
+            color: {accent} !important;
+        }}
+        .stButton > button:hover {{
+            background-color: {accent}0F !important;
+        }}
+        </style>
+        """
+    return css, template
+
+def apply_theme_css(theme: str) -> str:
+    """Apply base colors and force navy accents for Streamlit widgets."""
+    css, template = _build_css(theme, ACCENT_NAVY)
+    st.markdown(css, unsafe_allow_html=True)
+    return template
+
+# -------- COLOR HELPERS --------
+def _clamp01(x: float) -> float:
+    return max(0.0, min(1.0, x))
+
+def _hex_to_rgb(hex_str: str) -> tuple[float, float, float]:
+    s = hex_str.strip().lstrip("#")
+    if len(s) == 3:
+        s = "".join(ch * 2 for ch in s)
+    r = int(s[0:2], 16) / 255.0
+    g = int(s[2:4], 16) / 255.0
+    b = int(s[4:6], 16) / 255.0
+    return (r, g, b)
+
+def _rgb_to_hex(rgb: tuple[float, float, float]) -> str:
+    r, g, b = (int(_clamp01(c) * 255 + 0.5) for c in rgb)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+def _blend(rgb_a: tuple[float, float, float], rgb_b: tuple[float, float, float], t: float) -> tuple[float, float, float]:
+    t = _clamp01(t)
+    return (
+        rgb_a[0] * (1 - t) + rgb_b[0] * t,
+        rgb_a[1] * (1 - t) + rgb_b[1] * t,
+        rgb_a[2] * (1 - t) + rgb_b[2] * t,
+    )
+
+def derive_overlay_color(base_hex: str, theme: str) -> str:
+    base = _hex_to_rgb(base_hex)
+    target = (1.0, 1.0, 1.0) if theme != "dark" else (0.0, 0.0, 0.0)
+    overlay = _blend(base, target, 0.25)
+    return _rgb_to_hex(overlay)
+
+# -------- DATA HELPERS --------
+# pyarrow is optional; when installed, pandas can use its multithreaded CSV parser
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+DATA_COLUMNS = ["timestamp", "ping_ms", "download_mbps", "upload_mbps", "server_id", "server_name"]
+NUMERIC_COLUMNS = ["ping_ms", "download_mbps", "upload_mbps"]
+CATEGORY_COLUMNS = ["server_id", "server_name"]
+
+# Text columns for the C parser; keeps IDs from being inferred as floats
+C_READ_DTYPES = {"server_id": str, "server_name": str}
+
+# Compiled once; NA spellings left by str() of missing values, and a float-style ".0" on IDs
+_NA_RE = re.compile(r"^(?:nan|NaN|None)$")
+_NA_OR_DOT_ZERO_RE = re.compile(r"^(?:nan|NaN|None)$|\.0$")
+
+def normalize_data(df: pd.DataFrame) -> pd.DataFrame:
+    for c in set(DATA_COLUMNS).difference(df.columns):
+        df[c] = pd.NA
+
+    # float32 is ample for values rounded to 3 decimals and halves what numpy/plotly move
+    for c in NUMERIC_COLUMNS:
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype("float32")
+
+    ts = df["timestamp"]
+    if isinstance(ts.dtype, pd.DatetimeTZDtype):
+        ts = ts.dt.tz_convert("UTC")  # already typed by the pyarrow reader
+    elif pd.api.types.is_datetime64_dtype(ts.dtype):
+        ts = ts.dt.tz_localize("UTC")
+    else:
+        ts = pd.to_datetime(ts, utc=True, errors="coerce", format="ISO8601")
+    df["timestamp"] = ts.dt.as_unit("ns")
+    df = df.dropna(subset=["timestamp"]).sort_values("timestamp")
+
+    # One regex pass each: blank out NA spellings and (IDs only) drop a float-style ".0"
+    sid = df["server_id"].fillna("").astype(str)
+    df["server_id"] = sid.str.replace(_NA_OR_DOT_ZERO_RE, "", regex=True).str.strip()
+
+    sname = df["server_name"].fillna("").astype(str)
+    df["server_name"] = sname.str.replace(_NA_RE, "", regex=True).str.strip()
+
+    # A handful of distinct servers repeated on every row: store each string once
+    for c in CATEGORY_COLUMNS:
+        df[c] = df[c].astype("category")
+
+    return df
+
+def load_data(path: Path) -> pd.DataFrame:
+    """
+    Return the normalized CSV.  The collector only appends between hourly prunes, so the
+    frame is kept in session state and later reruns parse just the bytes past the last
+    read offset.  A replaced (pruned) or shrunk file falls back to a full reload.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return pd.DataFrame(columns=DATA_COLUMNS)
+
+    cached = st.session_state.get("data_cache")
+    if cached is not None and cached["path"] == str(path) and cached["ino"] == stat.st_ino:
+        if stat.st_size == cached["pos"]:
+            return cached["df"]
+        if stat.st_size > cached["pos"]:
+            with open(path, "rb") as f:
+                f.seek(cached["pos"])
+                chunk = f.read()
+            end = chunk.rfind(b"\n") + 1  # ignore a row the collector is still writing
+            if end == 0:
+                return cached["df"]
+            tail = pd.read_csv(io.BytesIO(chunk[:end]), header=None, names=cached["columns"], dtype=C_READ_DTYPES)
+            tail = normalize_data(tail)
+            df = pd.concat([cached["df"], tail], ignore_index=True)
+            for c in CATEGORY_COLUMNS:
+                # concat falls back to object when the categories differ; merge them instead
+                df[c] = union_categoricals([cached["df"][c], tail[c]], ignore_order=True)
+            if not df["timestamp"].is_monotonic_increasing:
+                df = df.sort_values("timestamp")
+            cached.update(df=df, pos=cached["pos"] + end)
+            return df
+
+    df, columns, pos = _load_data_cached(str(path), stat.st_mtime_ns, stat.st_size)
+    if pos == 0:
+        # No complete line (not even the header) yet: nothing to append to, so the next
+        # rerun must do a full read rather than parse the header as a data row
+        st.session_state.pop("data_cache", None)
+        return df
+    st.session_state["data_cache"] = {"path": str(path), "ino": stat.st_ino, "pos": pos, "columns": columns, "df": df}
+    return df
+
+def loaded_data_key() -> tuple[str, int, int]:
+    """Identifies exactly what the last load_data() returned: (path, inode, bytes consumed)."""
+    cached = st.session_state["data_cache"]
+    return (cached["path"], cached["ino"], cached["pos"])
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _load_data_cached(path_str: str, mtime_ns: int, size: int) -> tuple[pd.DataFrame, list[str], int]:
+    """Full parse, once per file version.  Returns (frame, CSV header, bytes consumed)."""
+    with open(path_str, "rb") as f:
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    if end == 0:
+        return pd.DataFrame(columns=DATA_COLUMNS), DATA_COLUMNS, 0
+    if CSV_ENGINE == "pyarrow":
+        raw = pd.read_csv(io.BytesIO(data[:end]), engine="pyarrow")  # types columns natively
+    else:
+        raw = pd.read_csv(io.BytesIO(data[:end]), dtype=C_READ_DTYPES)
+    columns = list(raw.columns)
+    return normalize_data(raw), columns, end
+
+def infer_sample_minutes(df: pd.DataFrame) -> int | None:
+    if df.shape[0] < 2:
+        return None
+    # Stay in integer nanoseconds throughout; convert to minutes once at the end
+    deltas_ns = np.diff(timestamp_ns(df))
+    lo, hi = np.quantile(deltas_ns, [0.05, 0.95])
+    trimmed = deltas_ns[(deltas_ns >= lo) & (deltas_ns <= hi)]
+    if trimmed.size == 0:
+        trimmed = deltas_ns
+    return int(max(1, min(round(float(np.median(trimmed)) / 60e9), 1440)))
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _infer_sample_minutes_cached(data_key: tuple[str, int, int], _df: pd.DataFrame) -> int | None:
+    # Keyed on loaded_data_key() only; the frame itself is not hashed.
+    return infer_sample_minutes(_df)
+
+@st.cache_resource(show_spinner=False)
+def resolve_tz(tz_name: str) -> ZoneInfo:
+    """ZoneInfo for tz_name (UTC if unknown), resolved once per process."""
+    # st.cache_resource rather than lru_cache: Streamlit re-executes this script on every
+    # rerun, which would hand an lru_cache-decorated function a fresh, empty cache.
+    try:
+        return ZoneInfo(tz_name)
+    except Exception:
+        return ZoneInfo("UTC")
+
+def convert_to_tz(utc_series: pd.Series, tz_name: str) -> pd.Series:
+    tz = resolve_tz(tz_name)
+    if str(utc_series.dt.tz) == str(tz):
+        return utc_series  # already in the target zone (e.g. UTC); skip the O(N) convert
+    return utc_series.dt.tz_convert(tz)
+
+def resample_overlay(df_local: pd.DataFrame, how: str) -> pd.DataFrame:
+    return (
+        df_local.set_index("timestamp_local")
+        .resample(how)
+        .agg({"download_mbps": "mean", "upload_mbps": "mean", "ping_ms": "mean"})
+        .dropna(how="all")
+        .reset_index()
+    )
+
+# Window helpers
+from datetime import timedelta
+def window_delta(choice: str) -> timedelta:
+    if choice == "Last Hour":
+        return timedelta(hours=1)
+    if choice == "Last 24 hours":
+        return timedelta(days=1)
+    if choice == "Last 7 days":
+        return timedelta(days=7)
+    if choice == "Last 30 days":
+        return timedelta(days=30)
+    if choice == "Last 12 months":
+        return timedelta(days=365)
+    return timedelta(days=30)
+
+def timestamp_ns(df: pd.DataFrame) -> np.ndarray:
+    """int64 UTC nanoseconds of df["timestamp"] (a view, no copy)."""
+    return df["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+
+def window_start(df: pd.DataFrame, now_utc: pd.Timestamp, choice: str) -> int:
+    """Position of the first row of df inside the window ending at now_utc."""
+    # Timestamps are sorted (load_data), so the cutoff is a binary search on the UTC nanoseconds
+    if choice == "Last Hour":
+        cutoff = now_utc - pd.Timedelta(hours=1)
+    elif choice == "Last 24 hours":
+        cutoff = now_utc - pd.Timedelta(days=1)
+    elif choice == "Last 7 days":
+        cutoff = now_utc - pd.Timedelta(days=7)
+    elif choice == "Last 30 days":
+        cutoff = now_utc - pd.Timedelta(days=30)
+    elif choice == "Last 12 months":
+        cutoff = now_utc - pd.Timedelta(days=365)
+    else:
+        return 0
+    return int(np.searchsorted(timestamp_ns(df), cutoff.value, side="left"))
+
+def slice_window(df: pd.DataFrame, now_utc: pd.Timestamp, choice: str, tz_name: str) -> pd.DataFrame:
+    """Rows of df inside the window, with their local times added as timestamp_local."""
+    # Only the surviving rows get tz-converted
+    df = df.iloc[window_start(df, now_utc, choice):]
+    return df.assign(timestamp_local=convert_to_tz(df["timestamp"], tz_name))
+
+def previous_period_overlay(
+    current_window: pd.DataFrame, df: pd.DataFrame, choice: str, tz_name: str
+) -> pd.DataFrame:
+    if current_window.empty:
+        return pd.DataFrame(columns=current_window.columns)
+    delta = pd.Timedelta(window_delta(choice))
+    start = current_window["timestamp"].iloc[0]
+    end = current_window["timestamp"].iloc[-1]
+    prev_start = start - delta
+    prev_end = end - delta
+    ts_ns = timestamp_ns(df)
+    lo = np.searchsorted(ts_ns, prev_start.value, side="left")
+    hi = np.searchsorted(ts_ns, prev_end.value, side="right")
+    prev = df.iloc[lo:hi]
+    return prev.assign(timestamp_local=convert_to_tz(prev["timestamp"] + delta, tz_name))
+
+# -------- RENDER HELPERS --------
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps when thinning (x, y) to n_out."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = (x - x[0]).astype("float64")
+    y = y.astype("float64")
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_hi = edges[i + 2] if i + 2 < len(edges) else n
+        nxt = y[hi:nxt_hi]
+        nxt = nxt[~np.isnan(nxt)]
+        avg_x = x[hi:nxt_hi].mean()
+        avg_y = nxt.mean() if nxt.size else y[a]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        keep[i + 1] = a
+    return keep
+
+def downsample(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(x, y) thinned with LTTB when longer than LTTB_MIN_POINTS; shape is kept, detail dropped."""
+    if len(y) <= LTTB_MIN_POINTS:
+        return x, y
+    idx = lttb_indices(x.view("int64"), y, LTTB_POINTS)
+    return x[idx], y[idx]
+
+def bucket_means(x: np.ndarray, *ys: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    (x, *ys) averaged into LTTB_POINTS equal-width time buckets when longer than
+    LTTB_MIN_POINTS.  All ys share the returned bucket centres, so grouped bars stay paired
+    and evenly spaced; empty buckets are NaN (no bar).
+    """
+    if len(x) <= LTTB_MIN_POINTS:
+        return (x, *ys)
+    t = x.view("int64")
+    t0 = t.min()
+    width = -(-(int(t.max()) - int(t0) + 1) // LTTB_POINTS)  # ceil, so every sample lands in a bucket
+    bucket = (t - t0) // width
+    centres = (t0 + width * np.arange(LTTB_POINTS) + width // 2).view("datetime64[ns]")
+    means = []
+    for y in ys:
+        valid = ~np.isnan(y)
+        sums = np.bincount(bucket[valid], weights=y[valid], minlength=LTTB_POINTS)
+        counts = np.bincount(bucket[valid], minlength=LTTB_POINTS)
+        with np.errstate(invalid="ignore"):
+            means.append((sums / counts).astype("float32"))
+    return (centres, *means)
+
+def plot_arrays(window: pd.DataFrame) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Local wall-clock times and float32 metric columns of window as NumPy arrays for Plotly."""
+    # Plotly drops the UTC offset when serializing tz-aware times, so naive local times plot the same
+    x = window["timestamp_local"].dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+    return x, {c: window[c].to_numpy(dtype="float32") for c in NUMERIC_COLUMNS}
+
+def render_results(fig: go.Figure, stats: pd.DataFrame) -> None:
+    st.plotly_chart(fig, use_container_width=True)
+    st.subheader("Summary (window above)")
+    st.dataframe(stats, use_container_width=True, height=200)
+
+# -------- PAGE --------
+st.set_page_config(page_title="Speedtest Monitor", layout="wide")
+st.title("Speedtest Monitor")
+
+# Minimal top controls
+c1, c2 = st.columns([1, 1])
+with c1:
+    chart_mode = st.radio("Chart Type", ["Bar", "Line / Curve"], index=0, horizontal=True)
+with c2:
+    autorefresh = st.toggle("Auto-refresh every 60s", value=True)
+
+refresh_clicked = st.button("Refresh now", disabled=autorefresh, key="refresh_now_btn")
+
+if autorefresh:
+    try:
+        from streamlit_autorefresh import st_autorefresh
+        st_autorefresh(interval=60_000, key="refresh")
+    except ImportError:
+        st.caption("Auto-refresh helper not installed.  Run: pip install streamlit-autorefresh")
+else:
+    if refresh_clicked:
+        st.rerun()
+
+# SETTINGS
+with st.expander("Settings", expanded=False):
+    st.markdown("**Settings / Timezone**")
+    tz_name = st.selectbox(
+        "Timezone", ALL_TZS, index=(ALL_TZS.index(DEFAULT_TZ) if DEFAULT_TZ in ALL_TZS else ALL_TZS.index("UTC"))
+    )
+
+    st.markdown("**Settings / Theme**")
+    theme_choice = st.selectbox("Theme", ["Auto (Windows)", "Light", "Dark"], index=0)
+
+    st.markdown("**Settings / Color selection**")
+    theme = detect_windows_theme() if theme_choice.startswith("Auto") else ("dark" if theme_choice.lower().startswith("dark") else "light")
+    plotly_template = apply_theme_css(theme)
+
+    colc1, colc2, colc3 = st.columns(3)
+    with colc1:
+        color_down = st.color_picker("Download color", DEFAULT_COLOR_DOWNLOAD, key="color_down")
+    with colc2:
+        color_up   = st.color_picker("Upload color", DEFAULT_COLOR_UPLOAD, key="color_up")
+    with colc3:
+        color_ping = st.color_picker("Ping color", DEFAULT_COLOR_PING, key="color_ping")
+
+# If expander not opened, still set defaults
+if "theme" not in locals():
+    theme = detect_windows_theme()
+    plotly_template = apply_theme_css(theme)
+    color_down, color_up, color_ping = DEFAULT_COLOR_DOWNLOAD, DEFAULT_COLOR_UPLOAD, DEFAULT_COLOR_PING
+
+# Derived overlay colors
+overlay_down = derive_overlay_color(color_down, theme)
+overlay_up   = derive_overlay_color(color_up, theme)
+overlay_ping = derive_overlay_color(color_ping, theme)
+
+# Load data
+df = load_data(DEFAULT_CSV)
+if df.empty:
+    st.caption("Each point represents a sample.  Data retained for 30 days (main CSV).")
+    st.info(f"No data yet.  Waiting for collector to write results to:\n{DEFAULT_CSV}")
+    st.stop()
+data_key = loaded_data_key()
+
+# Caption with detected sampling interval
+sample_min = _infer_sample_minutes_cached(data_key, df)
+if sample_min is None:
+    st.caption("Each point represents a sample.  Data retained for 30 days (main CSV).")
+else:
+    unit = "minute" if sample_min == 1 else "minutes"
+    st.caption(f"Each point represents a {sample_min}-{unit} sample.  Data retained for 30 days (main CSV).")
+
+# Server filter
+# Labels are built from the few distinct (id, name) pairs, not every row
+pairs = df[["server_id", "server_name"]].drop_duplicates().astype(str)
+pairs = pairs[pairs["server_id"].str.len() > 0]
+server_labels = sorted(set(pairs["server_id"].str.cat(pairs["server_name"].replace("", "(no name)"), sep=" · ")))
+
+col_srv1, col_srv2 = st.columns([3, 1])
+with col_srv1:
+    selected_labels = st.multiselect("Servers", server_labels, default=server_labels)
+with col_srv2:
+    include_blank = st.checkbox("Include blanks", value=True, help="Include rows with no server ID/name")
+
+if selected_labels:
+    selected_ids = set(l.split(" · ", 1)[0] for l in selected_labels)
+    mask = df["server_id"].isin(selected_ids)
+    if include_blank:
+        mask = mask | (df["server_id"] == "")
+    df = df[mask]
+else:
+    if not include_blank:
+        df = df[df["server_id"] != ""]
+
+# Window and overlay controls
+range_choice = st.selectbox(
+    "Show window", ["Last Hour", "Last 24 hours", "Last 7 days", "Last 30 days", "Last 12 months"], index=2
+)
+show_prev_overlay = st.checkbox(
+    "Show previous period overlay",
+    value=False,
+    help="Compare against the immediately preceding period of the same length.",
+)
+
+# Auto-refresh reruns usually find the data unchanged: reuse the last chart and summary
+# unless the data or any chart input changed, or rows aged out of the window's start.
+now_utc = pd.Timestamp.now(tz="UTC")
+start = window_start(df, now_utc, range_choice)
+window_key = (data_key, tz_name, range_choice, show_prev_overlay, tuple(selected_labels), include_blank, start)
+render_key = (window_key, chart_mode, theme, color_down, color_up, color_ping)
+last_render = st.session_state.get("render_cache")
+if last_render is not None and last_render["key"] == render_key:
+    render_results(last_render["fig"], last_render["stats"])
+    st.stop()
+
+# Style-only changes (chart type, theme, colors) keep the sliced windows
+last_window = st.session_state.get("window_cache")
+if last_window is not None and last_window["key"] == window_key:
+    current_window, prev_aligned = last_window["current"], last_window["prev"]
+else:
+    current_window = slice_window(df, now_utc, range_choice, tz_name)
+    if current_window.empty:
+        st.info("No data in the selected window.")
+        st.stop()
+
+    prev_aligned = pd.DataFrame()
+    if show_prev_overlay:
+        prev_aligned = previous_period_overlay(current_window, df, range_choice, tz_name)
+    st.session_state["window_cache"] = {"key": window_key, "current": current_window, "prev": prev_aligned}
+
+# Chart
+fig = go.Figure()
+x, ys = plot_arrays(current_window)
+# Stats below use the full window; only the plotted points are thinned
+x_ping, y_ping = downsample(x, ys["ping_ms"])
+
+if chart_mode.startswith("Bar"):
+    # Grouped bars are sized from the closest x gap, so both bar traces need one shared,
+    # evenly spaced x: bucket means rather than per-trace LTTB picks
+    x_bars, y_down, y_up = bucket_means(x, ys["download_mbps"], ys["upload_mbps"])
+    x_down = x_up = x_bars
+    fig.add_bar(
+        name="Download (Mbps)",
+        x=x_down,
+        y=y_down,
+        marker=dict(color=color_down, line=dict(width=0)),
+        opacity=0.85,
+        legendgroup="primary_down",
+    )
+    fig.add_bar(
+        name="Upload (Mbps)",
+        x=x_up,
+        y=y_up,
+        marker=dict(color=color_up, line=dict(width=0)),
+        opacity=0.85,
+        legendgroup="primary_up",
+    )
+    fig.add_trace(
+        go.Scattergl(
+            name="Ping (ms)",
+            x=x_ping,
+            y=y_ping,
+            mode="lines",
+            line=dict(color=color_ping, width=2),
+            yaxis="y2",
+            legendgroup="primary_ping",
+        )
+    )
+else:
+    x_down, y_down = downsample(x, ys["download_mbps"])
+    x_up, y_up = downsample(x, ys["upload_mbps"])
+    fig.add_trace(
+        go.Scattergl(
+            name="Download (Mbps)",
+            x=x_down,
+            y=y_down,
+            mode="lines",
+            line=dict(color=color_down, width=2.5),
+            legendgroup="primary_down",
+        )
+    )
+    fig.add_trace(
+        go.Scattergl(
+            name="Upload (Mbps)",
+            x=x_up,
+            y=y_up,
+            mode="lines",
+            line=dict(color=color_up, width=2.5),
+            legendgroup="primary_up",
+        )
+    )
+    fig.add_trace(
+        go.Scattergl(
+            name="Ping (ms)",
+            x=x_ping,
+            y=y_ping,
+            mode="lines",
+            line=dict(color=color_ping, width=2.5),
+            yaxis="y2",
+            legendgroup="primary_ping",
+        )
+    )
+
+# Previous-period overlay
+if show_prev_overlay and not prev_aligned.empty:
+    x_prev, ys_prev = plot_arrays(prev_aligned)
+    x_prev_down, y_prev_down = downsample(x_prev, ys_prev["download_mbps"])
+    x_prev_up, y_prev_up = downsample(x_prev, ys_prev["upload_mbps"])
+    x_prev_ping, y_prev_ping = downsample(x_prev, ys_prev["ping_ms"])
+    fig.add_trace(
+        go.Scattergl(
+            name="Prev period Download",
+            x=x_prev_down,
+            y=y_prev_down,
+            mode="lines",
+            line=dict(color=overlay_down, width=3.0, dash="dash"),
+            opacity=0.95,
+            legendgroup="overlay_down",
+        )
+    )
+    fig.add_trace(
+        go.Scattergl(
+            name="Prev period Upload",
+            x=x_prev_up,
+            y=y_prev_up,
+            mode="lines",
+            line=dict(color=overlay_up, width=3.0, dash="dash"),
+            opacity=0.95,
+            legendgroup="overlay_up",
+        )
+    )
+    fig.add_trace(
+        go.Scattergl(
+            name="Prev period Ping",
+            x=x_prev_ping,
+            y=y_prev_ping,
+            mode="lines",
+            line=dict(color=overlay_ping, width=3.0, dash="dash"),
+            opacity=0.95,
+            yaxis="y2",
+            legendgroup="overlay_ping",
+        )
+    )
+
+fig.update_layout(
+    template=plotly_template,
+    barmode="group",
+    legend_title_text="Metrics",
+    xaxis_title=f"Time ({tz_name})",
+    yaxis_title="Speed (Mbps)",
+    yaxis2=dict(title="Ping (ms)", overlaying="y", side="right", showgrid=False),
+    margin=dict(l=50, r=50, t=50, b=50),
+    hovermode="x unified",
+)
+
+# Summary
+# Only the three stats shown; describe() would also compute count/std/quartiles.  The columns
+# are float32, which stores the collector's 200.01 as 200.0099945...; rounding back to its 3
+# decimals in float64 recovers the written values, so min/max/mean match the CSV exactly.
+stats = (
+    current_window[["download_mbps", "upload_mbps", "ping_ms"]]
+    .astype("float64")
+    .round(3)
+    .agg(["mean", "min", "max"])
+    .T
+)
+
+st.session_state["render_cache"] = {"key": render_key, "fig": fig, "stats": stats}
+render_results(fig, stats)
@@ -1,19 +1,18 @@
 from __future__ import annotations
-import pathlib
-import subprocess
 import sys
 
+from ._paths import _locate
+
 def main(argv: list[str] | None = None) -> None:
     if argv is None:
         argv = sys.argv[1:]
 
-    root = pathlib.Path(__file__).resolve().parents[2]
-    app = root / "dashboard.py"
-    if not app.exists():
-        alt = pathlib.Path(__file__).resolve().parent / "dashboard.py"
-        if alt.exists():
-            app = alt
+    _, app = _locate("dashboard.py")
+
+    # Run Streamlit's CLI in this process (what the `streamlit` console script calls)
+    # instead of starting a second interpreter with `python -m streamlit`.
+    from streamlit.web import cli as stcli
 
-    cmd = [sys.executable, "-m", "streamlit", "run", str(app)]
-    cmd.extend(argv)  # allow --server.port etc.
-    subprocess.run(cmd, check=True)
+    sys.argv = ["streamlit", "run", app]
+    sys.argv.extend(argv)  # allow --server.port etc.
+    stcli.main()
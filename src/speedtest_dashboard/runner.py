@@ -1,40 +1,168 @@
 from __future__ import annotations
-import argparse
+import asyncio
+import functools
+import os
+import shutil
+import signal
 import subprocess
 import sys
-import time
-import pathlib
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from ._paths import _locate
+
+if TYPE_CHECKING:
+    import argparse  # imported lazily at runtime: only the fallback parser needs it
+
+_PY = sys.executable
+
+# POSIX: with close_fds=False (our fds are non-inheritable anyway, PEP 446) and no
+# session/process-group change, Popen starts children via posix_spawn (vfork + exec)
+# instead of fork.  The children share the runner's terminal, so a Ctrl-C reaches them
+# directly; the runner still forwards stop signals to the dashboard and reaps both.
+_SPAWN_OPTS = {"close_fds": False, "restore_signals": False} if os.name == "posix" else {}
+_STOP_SIGNALS = [getattr(signal, name) for name in ("SIGINT", "SIGTERM", "SIGHUP") if hasattr(signal, name)]
+
+def _terminate(proc: asyncio.subprocess.Process) -> None:
+    try:
+        proc.terminate()
+    except ProcessLookupError:
+        pass  # already gone
+
+def _kill(proc: asyncio.subprocess.Process) -> None:
+    try:
+        proc.kill()
+    except ProcessLookupError:
+        pass  # exited after the terminate timeout, before the kill
+
+async def _stop(proc: asyncio.subprocess.Process, timeout: float = 2.0) -> None:
+    """Terminate proc, escalating to kill if it has not exited after timeout seconds."""
+    _terminate(proc)
+    try:
+        await asyncio.wait_for(proc.wait(), timeout)
+    except TimeoutError:
+        _kill(proc)
+        await proc.wait()
+
+class _ChildExited(Exception):
+    """Raised by _supervise when its child exits; ends the runner's TaskGroup."""
+
+    def __init__(self, cmd: tuple[str, ...], returncode: int) -> None:
+        super().__init__(cmd, returncode)
+        self.cmd = cmd
+        self.returncode = returncode
+
+async def _supervise(proc: asyncio.subprocess.Process, cmd: tuple[str, ...]) -> None:
+    """Wait for proc; stop it if this task is cancelled because its sibling exited first."""
+    try:
+        returncode = await proc.wait()
+    finally:
+        await _stop(proc)
+    raise _ChildExited(cmd, returncode)
+
+async def _amain(
+    col_cmd: tuple[str, ...], dash_cmd: tuple[str, ...]
+) -> tuple[tuple[str, ...] | None, int]:
+    """
+    Run the collector alongside the dashboard until either exits, then stop the other.
+    Returns the command of the child that exited first and its exit code, or
+    (None, 128 + signum) when a stop signal asked the runner to shut down.
+    """
+    col_proc = await asyncio.create_subprocess_exec(*col_cmd, **_SPAWN_OPTS)
+    try:
+        dash_proc = await asyncio.create_subprocess_exec(*dash_cmd, **_SPAWN_OPTS)
+    except BaseException:
+        await _stop(col_proc)
+        raise
+
+    # A terminal Ctrl-C or a service manager's SIGTERM also reaches the children, and
+    # whichever dies first ends the group; remember the shutdown was asked for so that
+    # exit is not reported as a crash.
+    stop_signals: list[int] = []
+
+    def request_stop(sig: int) -> None:
+        stop_signals.append(sig)
+        _terminate(dash_proc)
+
+    loop = asyncio.get_running_loop()
+    for sig in _STOP_SIGNALS:
+        try:
+            loop.add_signal_handler(sig, request_stop, sig)
+        except NotImplementedError:
+            pass  # Windows
+
+    # The first child to exit raises into the group, which cancels (and so stops) the other
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_supervise(col_proc, col_cmd))
+            tg.create_task(_supervise(dash_proc, dash_cmd))
+    except* _ChildExited as eg:
+        exited = eg.exceptions[0]
+    if stop_signals:
+        return None, 128 + stop_signals[0]
+    if exited.cmd is col_cmd:
+        print(f"Collector exited with code {exited.returncode}; stopping the dashboard.", file=sys.stderr)
+    return exited.cmd, exited.returncode
+
+def _parse_args_fast(argv: list[str]) -> SimpleNamespace | None:
+    """
+    Parse the common invocations (no args, or only --interval/--port/--headless) without
+    argparse.  Returns None for anything else (help, abbreviations, pass-through Streamlit
+    flags, bad values) so argparse handles it with its usual messages.
+    """
+    args = SimpleNamespace(interval=120, port=8501, headless=False)
+    it = iter(argv)
+    for tok in it:
+        if tok == "--headless":
+            args.headless = True
+            continue
+        name, eq, value = tok.partition("=")
+        if name not in ("--interval", "--port"):
+            return None
+        if not eq:
+            value = next(it, None)
+        try:
+            setattr(args, name[2:], int(value))
+        except (TypeError, ValueError):
+            return None
+    return args
+
+@functools.lru_cache(maxsize=1)
+def _parser() -> argparse.ArgumentParser:
+    """The argparse fallback parser, built on first use and shared for the process."""
+    import argparse
 
-def main() -> None:
     p = argparse.ArgumentParser(prog="speedtest-dashboard", description="Launch collector + dashboard")
     p.add_argument("--interval", type=int, default=120, help="Collector interval in seconds (default 120)")
     p.add_argument("--port", type=int, default=8501, help="Dashboard port (default 8501)")
     p.add_argument("--headless", action="store_true", help="Do not open browser automatically")
-    args, unknown = p.parse_known_args()
+    return p
 
-    root = pathlib.Path(__file__).resolve().parents[2]
-    collector = root / "collector.py"
-    dashboard = root / "dashboard.py"
+def _parse_args(argv: list[str]) -> tuple[SimpleNamespace, list[str]]:
+    args = _parse_args_fast(argv)
+    if args is not None:
+        return args, []
+    return _parser().parse_known_args(argv)
 
-    col_cmd = [sys.executable, str(collector), "--daemon", "--interval", str(args.interval)]
-    col_proc = subprocess.Popen(col_cmd)
+def main() -> None:
+    args, unknown = _parse_args(sys.argv[1:])
 
-    dash_cmd = [sys.executable, "-m", "streamlit", "run", str(dashboard), "--server.port", str(args.port)]
-    if args.headless:
-        dash_cmd += ["--browser.gatherUsageStats", "false", "--server.headless", "true"]
-    dash_cmd += unknown
+    _, collector = _locate("collector.py")
+    _, dashboard = _locate("dashboard.py")
 
-    try:
-        subprocess.run(dash_cmd, check=True)
-    finally:
-        try:
-            col_proc.terminate()
-            for _ in range(10):
-                if col_proc.poll() is not None:
-                    break
-                time.sleep(0.2)
-        except Exception:
-            pass
+    col_cmd = (_PY, collector, "--daemon", "--interval", str(args.interval))
+
+    # The streamlit launcher installed next to this interpreter skips `-m`'s module search
+    streamlit_exe = shutil.which("streamlit", path=os.path.dirname(_PY))
+    streamlit_cmd = (streamlit_exe,) if streamlit_exe else (_PY, "-m", "streamlit")
+    headless = ("--browser.gatherUsageStats", "false", "--server.headless", "true") if args.headless else ()
+    dash_cmd = (*streamlit_cmd, "run", dashboard, "--server.port", str(args.port), *headless, *unknown)
+
+    cmd, rc = asyncio.run(_amain(col_cmd, dash_cmd))
+    if cmd is None:
+        sys.exit(rc)  # stopped on request: the shell's usual 128 + signal number
+    if rc != 0:
+        raise subprocess.CalledProcessError(rc, cmd)
 
 if __name__ == "__main__":
     main()